@@ -12,16 +12,32 @@ Version: 1.0
 
 import redis
 import redis.sentinel
+from redis.utils import HIREDIS_AVAILABLE
+try:
+    from redis.cache import CacheConfig
+except ImportError:  # redis-py < 5.1 has no client-side caching
+    CacheConfig = None
+try:
+    import readline
+except ImportError:  # not available on Windows
+    readline = None
 import json
+import orjson
 import time
 import uuid
 import hashlib
 import logging
 import argparse
+import getpass
 import sys
 import os
+import random
+import re
+from collections import Counter
+import socket
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from colorama import Fore, Back, Style, init
 
@@ -39,6 +55,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Menu input history, kept across runs when readline is available
+HISTORY_FILE = os.path.expanduser("~/.redis_sentinel_demo_history")
+HISTORY_LENGTH = 1000
+
+# Key count above which listing every key is worth a warning
+LARGE_KEYSPACE_THRESHOLD = 10000
+
+# Probe idle connections so dead peers are detected in about a minute (Linux option names)
+TCP_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (('TCP_KEEPIDLE', 30), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+}
+
+# Cache TTL in seconds per key domain (the part of the cache key before the first ':')
+CACHE_TTL_POLICY = {
+    "user": 300,
+    "session": 1800,
+    "analytics": 3600,
+    "availability": 60,
+}
+DEFAULT_CACHE_TTL = 300
+
+# Commands per pipeline flush in the performance stress test
+PERF_TEST_BATCH_SIZE = 1000
+
+# Keys per UNLINK command when cleaning up test data
+CLEANUP_CHUNK_SIZE = 500
+
+# Circuit breaker: failures within the window that open it, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_WINDOW_SECONDS = 10
+BREAKER_OPEN_SECONDS = 30
+
+# Seconds to wait for Sentinel to announce the new master after a failover
+FAILOVER_TIMEOUT = 30
+
+# Matches the key=value pairs of an INFO replication slaveN entry
+_SLAVE_KV = re.compile(r'(\w+)=([^,]+)')
+
+# Update last_access, refresh the TTL and return all fields, only if the session still exists
+SESSION_TOUCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+end
+redis.call('HSET', KEYS[1], 'last_access', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# Apply one INCRBY per key (skipped for zero deltas) and return every counter's value
+INCRBY_BATCH_SCRIPT = """
+local values = {}
+for i = 1, #KEYS do
+    local delta = tonumber(ARGV[i])
+    if delta ~= 0 then
+        values[i] = redis.call('INCRBY', KEYS[i], delta)
+    else
+        values[i] = tonumber(redis.call('GET', KEYS[i]) or '0')
+    end
+end
+return values
+"""
+
 @dataclass
 class SentinelConfig:
     """Sentinel configuration class"""
@@ -47,6 +127,13 @@ class SentinelConfig:
     password: Optional[str] = None
     socket_timeout: float = 0.5
     socket_connect_timeout: float = 0.5
+    # Master client timeouts, tight enough that a dead socket fails fast instead of stalling
+    master_socket_timeout: float = 2
+    master_socket_connect_timeout: float = 1
+    health_check_interval: int = 15
+    max_connections: int = 32
+    pool_timeout: float = 5
+    client_cache_size: int = 0  # 0 disables RESP3 client-side caching
     
 class ColorPrinter:
     """Colored output utility class"""
@@ -75,6 +162,9 @@ class ColorPrinter:
     def header(message: str):
         print(f"{Fore.CYAN}{Style.BRIGHT}{message}{Style.RESET_ALL}")
 
+class SentinelBlockingConnectionPool(redis.sentinel.SentinelConnectionPool, redis.BlockingConnectionPool):
+    """Sentinel-managed connection pool that waits for a free connection instead of growing unbounded"""
+
 class RedisSentinelManager:
     """Redis Sentinel connection manager"""
     
@@ -93,46 +183,161 @@ class RedisSentinelManager:
                 socket_connect_timeout=self.config.socket_connect_timeout
             )
             
+            # Server-assisted client-side caching: reads are served locally until the server invalidates them
+            cache_kwargs = {}
+            if self.config.client_cache_size:
+                if CacheConfig is None:
+                    ColorPrinter.warning("Client-side caching requires redis-py 5.1+, continuing without it")
+                else:
+                    cache_kwargs = {
+                        'protocol': 3,
+                        'cache_config': CacheConfig(max_size=self.config.client_cache_size)
+                    }
+            
             # Get master node connection
-            self.redis_client = self.sentinel.master_for(
+            redis_client = self.sentinel.master_for(
                 self.config.master_name,
-                socket_timeout=self.config.socket_timeout,
-                socket_connect_timeout=self.config.socket_connect_timeout,
+                connection_pool_class=SentinelBlockingConnectionPool,
+                max_connections=self.config.max_connections,
+                timeout=self.config.pool_timeout,
+                socket_timeout=self.config.master_socket_timeout,
+                socket_connect_timeout=self.config.master_socket_connect_timeout,
+                socket_keepalive=True,
+                socket_keepalive_options=TCP_KEEPALIVE_OPTIONS,
+                health_check_interval=self.config.health_check_interval,
                 password=self.config.password,
-                decode_responses=True
+                decode_responses=True,
+                **cache_kwargs
             )
             
             # Test connection
-            self.redis_client.ping()
+            redis_client.ping()
             ColorPrinter.success("Redis Sentinel connection established successfully")
             
+            # Release the previous client's pooled sockets when reconnecting
+            if self.redis_client is not None:
+                self.redis_client.close()
+                self.redis_client.connection_pool.disconnect()
+            self.redis_client = redis_client
+            
+            self._select_sentinel_readers()
+            
+            # redis-py picks the hiredis C parser automatically when it is installed
+            if HIREDIS_AVAILABLE:
+                logger.debug("Using hiredis parser for RESP replies")
+            else:
+                ColorPrinter.warning("hiredis not installed, using pure-Python RESP parser (pip install 'redis[hiredis]')")
+            
         except Exception as e:
             ColorPrinter.error(f"Failed to connect to Redis Sentinel: {e}")
             raise
     
+    def _select_sentinel_readers(self):
+        """Pick how Sentinel state is read, probing one reachable Sentinel
+        
+        Sentinel.sentinel_masters() fans out to every node and, on newer redis-py, only
+        returns a status flag, so the probe asks the individual Sentinel clients instead.
+        If none answers, the fallback readers stay in place until the next _connect.
+        """
+        native = False
+        for sentinel_client in self.sentinel.sentinels:
+            try:
+                native = isinstance(sentinel_client.sentinel_masters(), dict)
+                break
+            except redis.RedisError as e:
+                logger.debug(f"Sentinel probe failed, trying next Sentinel: {e}")
+        else:
+            logger.warning("No Sentinel answered the capability probe, using alternative queries")
+        
+        if native:
+            self._read_master_info = self._master_info_from_sentinel
+            self._read_slaves_info = self._slaves_info_from_sentinel
+            self._read_sentinels_info = self._sentinels_info_from_sentinel
+        else:
+            self._read_master_info = self._master_info_from_discovery
+            self._read_slaves_info = self._slaves_info_from_replication
+            self._read_sentinels_info = self._sentinels_info_from_config
+    
+    def _query_sentinel(self, command: str, *args):
+        """Run a Sentinel command on the first reachable Sentinel"""
+        error = None
+        for sentinel_client in self.sentinel.sentinels:
+            try:
+                return getattr(sentinel_client, command)(*args)
+            except redis.RedisError as e:
+                error = e
+        raise error or redis.ConnectionError("No Sentinel configured")
+    
+    def _master_info_from_sentinel(self) -> Dict[str, Any]:
+        """Read master state from SENTINEL MASTER"""
+        return self._query_sentinel('sentinel_master', self.config.master_name)
+    
+    def _master_info_from_discovery(self) -> Dict[str, Any]:
+        """Build master information from the discovered master address"""
+        master_addr = self.sentinel.discover_master(self.config.master_name)
+        if not master_addr:
+            return {}
+        return {
+            'ip': master_addr[0],
+            'port': master_addr[1],
+            'flags': 'master',
+            'num-slaves': 'unknown',
+            'num-other-sentinels': 'unknown'
+        }
+    
+    def _slaves_info_from_sentinel(self) -> List[Dict[str, Any]]:
+        """Read slave state from SENTINEL SLAVES"""
+        return self._query_sentinel('sentinel_slaves', self.config.master_name)
+    
+    def _slaves_info_from_replication(self) -> List[Dict[str, Any]]:
+        """Build slave information from the master's INFO replication section"""
+        info = self.redis_client.info('replication')
+        slaves: List[Dict[str, Any]] = []
+        slave_count = info.get('connected_slaves', 0)
+        try:
+            slave_count = int(slave_count)
+        except Exception:
+            slave_count = 0
+        slave_keys = [f'slave{i}' for i in range(slave_count)]
+        for slave_key in slave_keys:
+            entry = info.get(slave_key)
+            if not entry:
+                continue
+            slave_data: Dict[str, Any] = {}
+            # 兼容字符串与字典两种格式
+            if isinstance(entry, str):
+                # 解析字符串: ip=x.x.x.x,port=xxxx,state=online,offset=xxx,lag=x
+                slave_data = dict(_SLAVE_KV.findall(entry))
+            elif isinstance(entry, dict):
+                slave_data = entry
+            else:
+                # 兜底：尽最大可能提取常用字段
+                if hasattr(entry, 'get'):
+                    slave_data['ip'] = entry.get('ip', 'unknown')
+                    slave_data['port'] = entry.get('port', 'unknown')
+                    slave_data['state'] = entry.get('state', 'unknown')
+            slaves.append({
+                'ip': str(slave_data.get('ip', 'unknown')),
+                'port': str(slave_data.get('port', 'unknown')),
+                'flags': f"slave,{slave_data.get('state', 'unknown')}"
+            })
+        return slaves
+    
+    def _sentinels_info_from_sentinel(self) -> List[Dict[str, Any]]:
+        """Read peer Sentinel state from SENTINEL SENTINELS"""
+        return self._query_sentinel('sentinel_sentinels', self.config.master_name)
+    
+    def _sentinels_info_from_config(self) -> List[Dict[str, Any]]:
+        """Build Sentinel information from the configured nodes"""
+        return [
+            {'ip': host, 'port': str(port), 'flags': 'sentinel'}
+            for host, port in self.config.sentinels
+        ]
+    
     def get_master_info(self) -> Dict[str, Any]:
         """Get master node information"""
         try:
-            masters = self.sentinel.sentinel_masters()
-            # 确保返回值是字典类型
-            if isinstance(masters, dict) and self.config.master_name in masters:
-                return masters[self.config.master_name]
-            elif not isinstance(masters, dict):
-                ColorPrinter.warning(f"Unexpected return type from sentinel_masters: {type(masters)}, trying alternative method")
-                # 尝试直接获取master信息
-                try:
-                    master_addr = self.sentinel.discover_master(self.config.master_name)
-                    if master_addr:
-                        return {
-                            'ip': master_addr[0],
-                            'port': master_addr[1],
-                            'flags': 'master',
-                            'num-slaves': 'unknown',
-                            'num-other-sentinels': 'unknown'
-                        }
-                except Exception as inner_e:
-                    ColorPrinter.warning(f"Alternative method also failed: {inner_e}")
-            return {}
+            return self._read_master_info()
         except Exception as e:
             ColorPrinter.error(f"Failed to get master node information: {e}")
             return {}
@@ -140,52 +345,7 @@ class RedisSentinelManager:
     def get_slaves_info(self) -> List[Dict[str, Any]]:
         """Get slave nodes information"""
         try:
-            result = self.sentinel.sentinel_slaves(self.config.master_name)
-            # 确保返回值是列表类型
-            if isinstance(result, list):
-                return result
-            else:
-                ColorPrinter.warning(f"Unexpected return type from sentinel_slaves: {type(result)}, trying alternative method")
-                # 尝试通过master连接获取复制信息
-                try:
-                    info = self.redis_client.info('replication')
-                    slaves: List[Dict[str, Any]] = []
-                    slave_count = info.get('connected_slaves', 0)
-                    try:
-                        slave_count = int(slave_count)
-                    except Exception:
-                        slave_count = 0
-                    for i in range(slave_count):
-                        slave_key = f'slave{i}'
-                        entry = info.get(slave_key)
-                        if not entry:
-                            continue
-                        slave_data: Dict[str, Any] = {}
-                        # 兼容字符串与字典两种格式
-                        if isinstance(entry, str):
-                            # 解析字符串: ip=x.x.x.x,port=xxxx,state=online,offset=xxx,lag=x
-                            for part in entry.split(','):
-                                if '=' in part:
-                                    k, v = part.split('=', 1)
-                                    slave_data[k.strip()] = v.strip()
-                        elif isinstance(entry, dict):
-                            for k, v in entry.items():
-                                slave_data[str(k)] = v
-                        else:
-                            # 兜底：尽最大可能提取常用字段
-                            if hasattr(entry, 'get'):
-                                slave_data['ip'] = entry.get('ip', 'unknown')
-                                slave_data['port'] = entry.get('port', 'unknown')
-                                slave_data['state'] = entry.get('state', 'unknown')
-                        slaves.append({
-                            'ip': str(slave_data.get('ip', 'unknown')),
-                            'port': str(slave_data.get('port', 'unknown')),
-                            'flags': f"slave,{slave_data.get('state', 'unknown')}"
-                        })
-                    return slaves
-                except Exception as inner_e:
-                    ColorPrinter.warning(f"Alternative method also failed: {inner_e}")
-                return []
+            return self._read_slaves_info()
         except Exception as e:
             ColorPrinter.error(f"Failed to get slave nodes information: {e}")
             return []
@@ -193,25 +353,61 @@ class RedisSentinelManager:
     def get_sentinels_info(self) -> List[Dict[str, Any]]:
         """Get Sentinel nodes information"""
         try:
-            result = self.sentinel.sentinel_sentinels(self.config.master_name)
-            # 确保返回值是列表类型
-            if isinstance(result, list):
-                return result
-            else:
-                ColorPrinter.warning(f"Unexpected return type from sentinel_sentinels: {type(result)}, using configured sentinels")
-                # 使用配置的sentinel节点信息
-                sentinels = []
-                for i, (host, port) in enumerate(self.config.sentinels):
-                    sentinels.append({
-                        'ip': host,
-                        'port': str(port),
-                        'flags': 'sentinel'
-                    })
-                return sentinels
+            return self._read_sentinels_info()
         except Exception as e:
             ColorPrinter.error(f"Failed to get Sentinel nodes information: {e}")
             return []
     
+    def get_cluster_snapshot(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Get master, slave and Sentinel nodes information in one round trip"""
+        master_name = self.config.master_name
+        for sentinel_client in self.sentinel.sentinels:
+            try:
+                pipe = sentinel_client.pipeline(transaction=False)
+                pipe.sentinel_master(master_name)
+                pipe.sentinel_slaves(master_name)
+                pipe.sentinel_sentinels(master_name)
+                master, slaves, sentinels = pipe.execute()
+            except redis.RedisError as e:
+                logger.debug(f"Sentinel snapshot query failed, trying next Sentinel: {e}")
+                continue
+            if isinstance(master, dict) and isinstance(slaves, list) and isinstance(sentinels, list):
+                return master, slaves, sentinels
+            break
+        
+        # Fall back to the individual queries, which handle unexpected return types
+        return self.get_master_info(), self.get_slaves_info(), self.get_sentinels_info()
+    
+    def _subscribe_switch_master(self):
+        """Subscribe to +switch-master on the first reachable Sentinel"""
+        for sentinel_client in self.sentinel.sentinels:
+            pubsub = sentinel_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe('+switch-master')
+                return pubsub
+            except redis.RedisError as e:
+                logger.debug(f"Sentinel subscription failed, trying next Sentinel: {e}")
+                pubsub.close()
+        return None
+    
+    def _wait_for_switch_master(self, pubsub, timeout: float) -> Optional[str]:
+        """Wait for this master's +switch-master event and return the new master address"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = pubsub.get_message(timeout=remaining)
+            if not message or message['type'] != 'message':
+                continue
+            data = message['data']
+            if isinstance(data, bytes):
+                data = data.decode()
+            # Payload: <master name> <old ip> <old port> <new ip> <new port>
+            parts = data.split()
+            if len(parts) == 5 and parts[0] == self.config.master_name:
+                return f"{parts[3]}:{parts[4]}"
+    
     def test_failover(self) -> bool:
         """Test failover"""
         try:
@@ -221,25 +417,33 @@ class RedisSentinelManager:
             
             ColorPrinter.info(f"Current master node: {current_addr}")
             
-            # Trigger failover
-            result = self.sentinel.sentinel_failover(self.config.master_name)
-            if result:
-                ColorPrinter.info("Failover command sent successfully, waiting for completion...")
-                time.sleep(5)
-                
-                # Check new master node
-                new_master = self.get_master_info()
-                new_addr = f"{new_master.get('ip', 'unknown')}:{new_master.get('port', 'unknown')}"
-                
-                if new_addr != current_addr:
-                    ColorPrinter.success(f"Failover successful, new master node: {new_addr}")
-                    return True
+            # Subscribe before triggering so the switch notification cannot be missed
+            pubsub = self._subscribe_switch_master()
+            try:
+                # Trigger failover
+                result = self.sentinel.sentinel_failover(self.config.master_name)
+                if result:
+                    ColorPrinter.info("Failover command sent successfully, waiting for completion...")
+                    if pubsub is not None:
+                        new_addr = self._wait_for_switch_master(pubsub, FAILOVER_TIMEOUT)
+                    else:
+                        # No Sentinel accepted the subscription, check once after a fixed wait
+                        time.sleep(5)
+                        new_master = self.get_master_info()
+                        new_addr = f"{new_master.get('ip', 'unknown')}:{new_master.get('port', 'unknown')}"
+                    
+                    if new_addr and new_addr != current_addr:
+                        ColorPrinter.success(f"Failover successful, new master node: {new_addr}")
+                        return True
+                    else:
+                        ColorPrinter.warning("Failover may not be completed or master node unchanged")
+                        return False
                 else:
-                    ColorPrinter.warning("Failover may not be completed or master node unchanged")
+                    ColorPrinter.error("Failed to send failover command")
                     return False
-            else:
-                ColorPrinter.error("Failed to send failover command")
-                return False
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
                 
         except Exception as e:
             ColorPrinter.error(f"Failover test failed: {e}")
@@ -251,27 +455,135 @@ class SessionManager:
     def __init__(self, redis_client: redis.Redis):
         self.redis_client = redis_client
         self.session_prefix = "session:"
+        self._prefix_len = len(self.session_prefix)
         self.user_prefix = "user:"
         self.session_timeout = 3600  # 1 hour
+        # Bind hot client methods once to skip attribute lookups per call
+        self._delete = redis_client.delete
+        # Touch the session and read it back in a single server-side round trip
+        self._touch = redis_client.register_script(SESSION_TOUCH_SCRIPT)
+        # Active session IDs kept current by keyspace notifications (None falls back to SCAN)
+        self._active_sessions = None
+        self._active_lock = threading.Lock()
+        self._tracker = None
+        self._start_session_tracking()
+    
+    def _start_session_tracking(self):
+        """Track active sessions through keyspace notifications"""
+        pubsub = None
+        try:
+            self._enable_keyspace_events()
+            
+            # Keyspace channels carry the key in the channel name, so the server only
+            # publishes session keys to us and the event name arrives as the payload
+            db = self.redis_client.connection_pool.connection_kwargs.get('db', 0)
+            channel_prefix = f'__keyspace@{db}__:{self.session_prefix}'
+            self._channel_prefix_len = len(channel_prefix)
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{f'{channel_prefix}*': self._on_session_event})
+            
+            # A reconnect may land on a newly promoted master, which needs the
+            # notification config again and a fresh seed for events missed meanwhile
+            pubsub.connection.register_connect_callback(self._on_tracking_reconnect)
+            
+            # Seed after subscribing so sessions created in between are not missed
+            with self._active_lock:
+                self._active_sessions = set(self._scan_sessions())
+            self._tracker = pubsub.run_in_thread(
+                sleep_time=1,
+                daemon=True,
+                exception_handler=self._on_tracking_error
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Keyspace notifications unavailable, listing sessions with SCAN: {e}")
+            with self._active_lock:
+                self._active_sessions = None
+            if pubsub is not None:
+                self._close_tracking_pubsub(pubsub)
+    
+    def _close_tracking_pubsub(self, pubsub):
+        """Close the subscriber, detaching the reconnect hook before its connection returns to the pool"""
+        connection = pubsub.connection
+        if connection is not None:
+            connection.deregister_connect_callback(self._on_tracking_reconnect)
+        pubsub.close()
+    
+    def _enable_keyspace_events(self):
+        """Enable keyspace notifications for generic commands, expirations and evictions"""
+        flags = self.redis_client.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+        required = 'K' if 'A' in flags else 'Kgxe'
+        missing = ''.join(flag for flag in required if flag not in flags)
+        if missing:
+            self.redis_client.config_set('notify-keyspace-events', flags + missing)
+    
+    def _on_tracking_reconnect(self, connection):
+        """Re-enable notifications on the current master and reseed after the subscriber reconnects"""
+        if self._tracker is None:
+            return
+        try:
+            self._enable_keyspace_events()
+            sessions = set(self._scan_sessions())
+        except redis.RedisError as e:
+            logger.warning(f"Session tracking lost after reconnect, listing sessions with SCAN: {e}")
+            sessions = None
+        with self._active_lock:
+            self._active_sessions = sessions
+    
+    def close(self):
+        """Stop the session tracking subscriber"""
+        tracker, self._tracker = self._tracker, None
+        if tracker is not None:
+            tracker.stop()
+            self._close_tracking_pubsub(tracker.pubsub)
+    
+    def _on_session_event(self, message: Dict[str, Any]):
+        """Record sessions whose TTL was set (create or touch), forget deleted, expired or evicted ones"""
+        event = message['data']
+        session_id = message['channel'][self._channel_prefix_len:]
+        with self._active_lock:
+            if self._active_sessions is None:
+                return
+            if event == 'expire':
+                self._active_sessions.add(session_id)
+            elif event in ('del', 'expired', 'evicted'):
+                self._active_sessions.discard(session_id)
+    
+    def _on_tracking_error(self, e: Exception, pubsub, thread):
+        """Stop tracking after a subscriber failure and fall back to SCAN"""
+        logger.warning(f"Session tracking stopped, listing sessions with SCAN: {e}")
+        with self._active_lock:
+            self._active_sessions = None
+        self._tracker = None
+        thread.stop()
+        self._close_tracking_pubsub(pubsub)
+    
+    def _scan_sessions(self) -> List[str]:
+        """Scan the keyspace for session IDs"""
+        pattern = f"{self.session_prefix}*"
+        # SCAN walks the keyspace in batches instead of blocking the master like KEYS
+        keys = list(self.redis_client.scan_iter(match=pattern, count=500))
+        plen = self._prefix_len
+        return [key[plen:] for key in keys]
     
     def create_session(self, username: str, user_data: Dict[str, Any]) -> str:
         """Create user session"""
         session_id = str(uuid.uuid4())
         session_key = f"{self.session_prefix}{session_id}"
         
+        # Stored as a hash so single fields can be updated without rewriting the session
+        now = datetime.now().isoformat()
         session_data = {
             "username": username,
-            "created_at": datetime.now().isoformat(),
-            "last_access": datetime.now().isoformat(),
-            "user_data": user_data
+            "created_at": now,
+            "last_access": now,
+            "user_data": orjson.dumps(user_data)
         }
         
         try:
-            self.redis_client.setex(
-                session_key,
-                self.session_timeout,
-                json.dumps(session_data)
-            )
+            pipe = self.redis_client.pipeline()
+            pipe.hset(session_key, mapping=session_data)
+            pipe.expire(session_key, self.session_timeout)
+            pipe.execute()
             ColorPrinter.success(f"Session created successfully: {session_id}")
             return session_id
         except Exception as e:
@@ -283,28 +595,45 @@ class SessionManager:
         session_key = f"{self.session_prefix}{session_id}"
         
         try:
-            session_data = self.redis_client.get(session_key)
-            if session_data:
-                data = json.loads(session_data)
-                # Update last access time
-                data["last_access"] = datetime.now().isoformat()
-                self.redis_client.setex(
-                    session_key,
-                    self.session_timeout,
-                    json.dumps(data)
-                )
-                return data
+            fields = self._touch(
+                keys=[session_key],
+                args=[self.session_timeout, datetime.now().isoformat()]
+            )
+            if fields:
+                it = iter(fields)
+                return self._decode_session(dict(zip(it, it)))
             return None
         except Exception as e:
             ColorPrinter.error(f"Failed to get session: {e}")
             return None
     
+    @staticmethod
+    def _decode_session(fields: Dict[str, str]) -> Dict[str, Any]:
+        """Convert stored session hash fields back into session data"""
+        fields["user_data"] = orjson.loads(fields.get("user_data") or "{}")
+        return fields
+    
+    def get_many_sessions(self, session_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get multiple sessions in one round trip (does not refresh their TTL)"""
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for session_id in session_ids:
+                pipe.hgetall(f"{self.session_prefix}{session_id}")
+            values = pipe.execute() if session_ids else []
+            return {
+                session_id: self._decode_session(value) if value else None
+                for session_id, value in zip(session_ids, values)
+            }
+        except Exception as e:
+            ColorPrinter.error(f"Failed to get sessions: {e}")
+            return {}
+    
     def delete_session(self, session_id: str) -> bool:
         """Delete session"""
         session_key = f"{self.session_prefix}{session_id}"
         
         try:
-            result = self.redis_client.delete(session_key)
+            result = self._delete(session_key)
             if result:
                 ColorPrinter.success(f"Session deleted successfully: {session_id}")
                 return True
@@ -317,10 +646,12 @@ class SessionManager:
     
     def list_active_sessions(self) -> List[str]:
         """List active sessions"""
+        with self._active_lock:
+            if self._active_sessions is not None:
+                return list(self._active_sessions)
+        
         try:
-            pattern = f"{self.session_prefix}*"
-            keys = self.redis_client.keys(pattern)
-            return [key.replace(self.session_prefix, "") for key in keys]
+            return self._scan_sessions()
         except Exception as e:
             ColorPrinter.error(f"Failed to get active sessions list: {e}")
             return []
@@ -331,33 +662,73 @@ class CacheManager:
     def __init__(self, redis_client: redis.Redis):
         self.redis_client = redis_client
         self.cache_prefix = "cache:"
+        # Bind hot client methods once to skip attribute lookups per call
+        self._get = redis_client.get
+        self._mget = redis_client.mget
+        self._set = redis_client.set
+        self._setex = redis_client.setex
+        self._delete = redis_client.delete
+        # Client-side cached GETs are answered locally, so keep them off pipelines
+        self._client_cache = redis_client.get_cache() if hasattr(redis_client, 'get_cache') else None
+    
+    @staticmethod
+    def ttl_for(key: str) -> int:
+        """Get the TTL policy for a cache key from its domain prefix (e.g. user:42)"""
+        return CACHE_TTL_POLICY.get(key.split(":", 1)[0], DEFAULT_CACHE_TTL)
     
-    def set_cache(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set cache"""
+    def set_cache(self, key: str, value: Any, ttl: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        """Set cache, using the key's TTL policy unless a TTL is given
+        
+        With nx=True the write is skipped if the key is already cached (SET EX NX),
+        so concurrent fillers do not overwrite each other. Returns True when written,
+        False when skipped by NX and None when the write failed.
+        """
         cache_key = f"{self.cache_prefix}{key}"
+        if ttl is None:
+            ttl = self.ttl_for(key)
         
         try:
             if isinstance(value, (dict, list)):
-                value = json.dumps(value)
+                payload = orjson.dumps(value)
+            elif isinstance(value, (bytes, bytearray)):
+                payload = bytes(value)
+            else:
+                payload = str(value).encode()
             
-            result = self.redis_client.setex(cache_key, ttl, str(value))
+            if nx:
+                result = self._set(cache_key, payload, ex=ttl, nx=True)
+            else:
+                result = self._setex(cache_key, ttl, payload)
             if result:
                 ColorPrinter.success(f"Cache set successfully: {key} (TTL: {ttl}s)")
                 return True
+            if nx:
+                ColorPrinter.info(f"Cache already populated by another client: {key}")
             return False
         except Exception as e:
             ColorPrinter.error(f"Failed to set cache: {e}")
-            return False
+            return None
     
     def get_cache(self, key: str) -> Optional[str]:
         """Get cache"""
         cache_key = f"{self.cache_prefix}{key}"
         
         try:
-            value = self.redis_client.get(cache_key)
+            # Only pay for the TTL lookup when it will be reported, and then in the same round trip
+            if self._client_cache is None and logger.isEnabledFor(logging.INFO):
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(cache_key)
+                pipe.ttl(cache_key)
+                value, ttl = pipe.execute()
+            else:
+                value = self._get(cache_key)
+                ttl = None
+            
             if value:
-                ttl = self.redis_client.ttl(cache_key)
-                ColorPrinter.info(f"Cache hit: {key} (remaining TTL: {ttl}s)")
+                if ttl is not None:
+                    ColorPrinter.info(f"Cache hit: {key} (remaining TTL: {ttl}s)")
+                else:
+                    ColorPrinter.info(f"Cache hit: {key}")
                 return value
             else:
                 ColorPrinter.info(f"Cache miss: {key}")
@@ -366,12 +737,23 @@ class CacheManager:
             ColorPrinter.error(f"Failed to get cache: {e}")
             return None
     
+    def get_many(self, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Get multiple caches in one round trip"""
+        cache_keys = [f"{self.cache_prefix}{key}" for key in keys]
+        
+        try:
+            values = self._mget(cache_keys) if cache_keys else []
+            return dict(zip(keys, values))
+        except Exception as e:
+            ColorPrinter.error(f"Failed to get caches: {e}")
+            return {}
+    
     def delete_cache(self, key: str) -> bool:
         """Delete cache"""
         cache_key = f"{self.cache_prefix}{key}"
         
         try:
-            result = self.redis_client.delete(cache_key)
+            result = self._delete(cache_key)
             if result:
                 ColorPrinter.success(f"Cache deleted successfully: {key}")
                 return True
@@ -388,13 +770,19 @@ class CounterManager:
     def __init__(self, redis_client: redis.Redis):
         self.redis_client = redis_client
         self.counter_prefix = "counter:"
+        # Bind hot client methods once to skip attribute lookups per call
+        self._incrby = redis_client.incrby
+        self._decrby = redis_client.decrby
+        self._get = redis_client.get
+        self._delete = redis_client.delete
+        self._incrby_batch = redis_client.register_script(INCRBY_BATCH_SCRIPT)
     
     def increment(self, key: str, amount: int = 1) -> int:
-        """Increment counter"""
+        """Increment counter atomically on the server (INCRBY), returning the new value"""
         counter_key = f"{self.counter_prefix}{key}"
         
         try:
-            result = self.redis_client.incrby(counter_key, amount)
+            result = self._incrby(counter_key, amount)
             ColorPrinter.success(f"Counter {key} incremented by {amount}, current value: {result}")
             return result
         except Exception as e:
@@ -402,23 +790,34 @@ class CounterManager:
             return 0
     
     def decrement(self, key: str, amount: int = 1) -> int:
-        """Decrement counter"""
+        """Decrement counter atomically on the server (DECRBY), returning the new value"""
         counter_key = f"{self.counter_prefix}{key}"
         
         try:
-            result = self.redis_client.decrby(counter_key, amount)
+            result = self._decrby(counter_key, amount)
             ColorPrinter.success(f"Counter {key} decremented by {amount}, current value: {result}")
             return result
         except Exception as e:
             ColorPrinter.error(f"Failed to decrement counter: {e}")
             return 0
     
+    def increment_many(self, amounts: Dict[str, int]) -> Dict[str, int]:
+        """Increment several counters atomically in one script call, returning all current values"""
+        keys = list(amounts)
+        counter_keys = [f"{self.counter_prefix}{key}" for key in keys]
+        
+        try:
+            return dict(zip(keys, self._incrby_batch(keys=counter_keys, args=list(amounts.values()))))
+        except Exception as e:
+            ColorPrinter.error(f"Failed to increment counters: {e}")
+            return {}
+    
     def get_count(self, key: str) -> int:
         """Get counter value"""
         counter_key = f"{self.counter_prefix}{key}"
         
         try:
-            result = self.redis_client.get(counter_key)
+            result = self._get(counter_key)
             count = int(result) if result else 0
             ColorPrinter.info(f"Counter {key} current value: {count}")
             return count
@@ -431,7 +830,7 @@ class CounterManager:
         counter_key = f"{self.counter_prefix}{key}"
         
         try:
-            result = self.redis_client.delete(counter_key)
+            result = self._delete(counter_key)
             if result:
                 ColorPrinter.success(f"Counter {key} reset successfully")
                 return True
@@ -445,19 +844,219 @@ class CounterManager:
 class RedisSentinelDemo:
     """Redis Sentinel Demo Program"""
     
-    def __init__(self):
+    PROMPT = "Please select operation: "
+    
+    # Menu texts are built once; each menu is rendered with a single write
+    MAIN_MENU = (
+        f"{Fore.CYAN}{Style.BRIGHT}\nRedis Sentinel Demo Program{Style.RESET_ALL}\n"
+        f"{Fore.CYAN}{Style.BRIGHT}{'=' * 50}{Style.RESET_ALL}\n"
+        "1. Show Cluster Information\n"
+        "2. Session Management Demo\n"
+        "3. CRUD Operations Demo\n"
+        "4. Cache Operations Demo\n"
+        "5. Counter Operations Demo\n"
+        "6. High Availability Test\n"
+        "0. Exit Program\n"
+        f"{'=' * 50}\n"
+    )
+    
+    SESSION_MENU = (
+        "\nSession Management Options:\n"
+        "1. Create Session\n"
+        "2. View Current Session\n"
+        "3. List All Active Sessions\n"
+        "4. Delete Session\n"
+        "0. Return to Main Menu\n"
+    )
+    
+    CRUD_MENU = (
+        "\nCRUD Operation Options:\n"
+        "1. Create/Update Key-Value\n"
+        "2. Read Key-Value\n"
+        "3. Delete Key\n"
+        "4. Batch Operations\n"
+        "5. List All Keys\n"
+        "0. Return to Main Menu\n"
+    )
+    
+    CACHE_MENU = (
+        "\nCache Operation Options:\n"
+        "1. Set Cache\n"
+        "2. Get Cache\n"
+        "3. Delete Cache\n"
+        "4. Simulate Database Query Cache\n"
+        "5. Get Multiple Caches\n"
+        "0. Return to Main Menu\n"
+    )
+    
+    COUNTER_MENU = (
+        "\nCounter Operation Options:\n"
+        "1. Increment Counter\n"
+        "2. Decrement Counter\n"
+        "3. Get Counter Value\n"
+        "4. Reset Counter\n"
+        "5. Simulate Website Visit Statistics\n"
+        "0. Return to Main Menu\n"
+    )
+    
+    HA_MENU = (
+        "\nHigh Availability Test Options:\n"
+        "1. Connection Status Test\n"
+        "2. Failover Test\n"
+        "3. Read-Write Consistency Test\n"
+        "4. Performance Stress Test\n"
+        "0. Return to Main Menu\n"
+    )
+    
+    def __init__(self, config_path: Optional[str] = None, client_cache_size: int = 0, verbose: bool = False,
+                 simulate_latency: float = 0.0):
+        self.config_path = config_path
+        self.client_cache_size = client_cache_size
+        self.verbose = verbose
+        self.simulate_latency = simulate_latency
+        
         # Initialize components
         self.sentinel_manager = None
         self.session_manager = None
         self.cache_manager = None
         self.counter_manager = None
         self.current_session_id = None
+        
+        # Shared non-transactional pipeline, rebuilt after reconnecting
+        self._pipe = None
+        
+        # Circuit breaker for the connection test, so a failing cluster is not waited on repeatedly
+        self._breaker = {"state": "CLOSED", "failures": [], "opened_at": 0.0}
+        
+        # Menu choices dispatch through handler tables instead of if/elif chains
+        self._main_handlers = {
+            "1": self.show_cluster_info,
+            "2": self.demo_session_management,
+            "3": self.demo_crud_operations,
+            "4": self.demo_cache_operations,
+            "5": self.demo_counter_operations,
+            "6": self.demo_high_availability,
+        }
+        self._session_handlers = {
+            "1": self._create_session,
+            "2": self._show_current_session,
+            "3": self._list_sessions,
+            "4": self._delete_session,
+        }
+        self._crud_handlers = {
+            "1": self._set_key,
+            "2": self._read_key,
+            "3": self._delete_key,
+            "4": self._batch_operations,
+            "5": self._list_keys,
+        }
+        self._cache_handlers = {
+            "1": self._set_cache,
+            "2": self._get_cache,
+            "3": self._delete_cache,
+            "4": self._query_user_with_cache,
+            "5": self._get_many_caches,
+        }
+        self._counter_handlers = {
+            "1": self._increment_counter,
+            "2": self._decrement_counter,
+            "3": self._get_counter,
+            "4": self._reset_counter,
+            "5": self._simulate_page_visits,
+        }
+        self._ha_handlers = {
+            "1": self._test_connection,
+            "2": self._test_failover,
+            "3": self._test_consistency,
+            "4": self._run_stress_test,
+        }
     
-    def setup_connection(self):
-        """Setup connection configuration"""
-        ColorPrinter.header("Redis Sentinel Connection Configuration")
-        ColorPrinter.header("=" * 50)
+    def _run_menu(self, menu: str, handlers: Dict[str, Callable[[], Any]]):
+        """Show a sub menu and dispatch choices until the user returns"""
+        while True:
+            sys.stdout.write(menu)
+            sys.stdout.flush()
+            
+            choice = input(self.PROMPT).strip()
+            if choice == "0":
+                break
+            
+            handler = handlers.get(choice)
+            if handler:
+                handler()
+            else:
+                ColorPrinter.warning("Invalid selection")
+    
+    def _pipeline(self):
+        """Get the shared pipeline, emptied and ready for a new batch"""
+        if self._pipe is None:
+            self._pipe = self.sentinel_manager.redis_client.pipeline(transaction=False)
+        else:
+            self._pipe.reset()
+        return self._pipe
+    
+    @staticmethod
+    def _count_masters(masters: Any) -> Optional[int]:
+        """Count monitored masters, or None when the reply has no size (some versions return a bool)"""
+        return len(masters) if hasattr(masters, "__len__") else None
+    
+    def _breaker_allows_call(self) -> bool:
+        """Check whether the circuit breaker lets a call through"""
+        breaker = self._breaker
+        if breaker["state"] == "OPEN":
+            if time.monotonic() - breaker["opened_at"] < BREAKER_OPEN_SECONDS:
+                return False
+            # Cooldown elapsed, let a single probe decide
+            breaker["state"] = "HALF_OPEN"
+        return True
+    
+    def _breaker_record(self, success: bool):
+        """Record a call outcome and update the circuit breaker state"""
+        breaker = self._breaker
+        if success:
+            breaker.update(state="CLOSED", failures=[])
+            return
         
+        now = time.monotonic()
+        breaker["failures"] = [t for t in breaker["failures"] if now - t < BREAKER_WINDOW_SECONDS] + [now]
+        if breaker["state"] == "HALF_OPEN" or len(breaker["failures"]) >= BREAKER_FAILURE_THRESHOLD:
+            breaker.update(state="OPEN", opened_at=now)
+            ColorPrinter.warning(f"Circuit opened, connection tests paused for {BREAKER_OPEN_SECONDS}s")
+    
+    def load_connection_config(self, config_path: str) -> Optional[SentinelConfig]:
+        """Load connection configuration from a JSON file"""
+        try:
+            with open(config_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("top level must be a JSON object")
+            nodes = data.get("sentinels", [])
+            if not isinstance(nodes, list):
+                raise ValueError('"sentinels" must be a list')
+            
+            sentinels = []
+            for node in nodes:
+                if isinstance(node, dict):
+                    sentinels.append((node["host"], int(node.get("port", 26379))))
+                else:
+                    sentinels.append((node[0], int(node[1])))
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            ColorPrinter.error(f"Failed to load configuration file {config_path}: {e}")
+            return None
+        
+        if not sentinels:
+            ColorPrinter.error("At least one Sentinel node is required")
+            return None
+        
+        ColorPrinter.success(f"Loaded configuration from {config_path}")
+        return SentinelConfig(
+            sentinels=sentinels,
+            master_name=data.get("service_name") or "mymaster",
+            password=data.get("password") or None
+        )
+    
+    def prompt_connection_config(self) -> Optional[SentinelConfig]:
+        """Prompt for connection configuration"""
         # Get Sentinel node configuration
         sentinels = []
         ColorPrinter.info("Please enter Sentinel node information (at least one node):")
@@ -476,40 +1075,71 @@ class RedisSentinelDemo:
         
         if not sentinels:
             ColorPrinter.error("At least one Sentinel node is required")
-            return False
+            return None
         
         # Get other configuration
         master_name = input("Master node name (default mymaster): ").strip() or "mymaster"
-        password = input("Redis password (optional): ").strip() or None
+        # getpass keeps the password off the screen and out of the readline history
+        password = getpass.getpass("Redis password (optional): ").strip() or None
         
-        # Create configuration and connect
+        return SentinelConfig(
+            sentinels=sentinels,
+            master_name=master_name,
+            password=password
+        )
+    
+    def setup_connection(self):
+        """Setup connection configuration"""
+        ColorPrinter.header("Redis Sentinel Connection Configuration")
+        ColorPrinter.header("=" * 50)
+        
+        # A configuration file skips all interactive prompts
+        if self.config_path:
+            config = self.load_connection_config(self.config_path)
+        else:
+            config = self.prompt_connection_config()
+        if config is None:
+            return False
+        config.client_cache_size = self.client_cache_size
+        
+        # Connect
         try:
-            config = SentinelConfig(
-                sentinels=sentinels,
-                master_name=master_name,
-                password=password
-            )
-            
             self.sentinel_manager = RedisSentinelManager(config)
-            
-            # Initialize managers
-            redis_client = self.sentinel_manager.redis_client
-            self.session_manager = SessionManager(redis_client)
-            self.cache_manager = CacheManager(redis_client)
-            self.counter_manager = CounterManager(redis_client)
-            
+            self._init_managers()
             return True
             
         except Exception as e:
             ColorPrinter.error(f"Connection failed: {e}")
             return False
     
+    def _init_managers(self):
+        """Create the data managers on top of the current Redis client"""
+        redis_client = self.sentinel_manager.redis_client
+        self.session_manager = SessionManager(redis_client)
+        self.cache_manager = CacheManager(redis_client)
+        self.counter_manager = CounterManager(redis_client)
+        self._pipe = None
+    
+    def _reconnect(self) -> bool:
+        """Rebuild the Redis client and every manager bound to it"""
+        try:
+            self.sentinel_manager._connect()
+        except Exception as e:
+            ColorPrinter.warning(f"Reconnection failed, keeping the current client: {e}")
+            return False
+        
+        if self.session_manager is not None:
+            self.session_manager.close()
+        self._init_managers()
+        return True
+    
     def show_cluster_info(self):
         """Show cluster information"""
         ColorPrinter.step("Getting cluster information...")
         
+        master_info, slaves_info, sentinels_info = self.sentinel_manager.get_cluster_snapshot()
+        
         # Master node information
-        master_info = self.sentinel_manager.get_master_info()
         if master_info:
             ColorPrinter.success("Master node information:")
             print(f"  Address: {master_info.get('ip', 'N/A')}:{master_info.get('port', 'N/A')}")
@@ -518,7 +1148,6 @@ class RedisSentinelDemo:
             print(f"  Sentinel count: {master_info.get('num-other-sentinels', 'N/A')}")
         
         # Slave node information
-        slaves_info = self.sentinel_manager.get_slaves_info()
         if slaves_info and isinstance(slaves_info, list):
             ColorPrinter.success(f"Slave node information ({len(slaves_info)} nodes):")
             for i, slave in enumerate(slaves_info, 1):
@@ -529,7 +1158,6 @@ class RedisSentinelDemo:
             ColorPrinter.info("Slave node information: No slave nodes found")
         
         # Sentinel node information
-        sentinels_info = self.sentinel_manager.get_sentinels_info()
         if sentinels_info and isinstance(sentinels_info, list):
             ColorPrinter.success(f"Sentinel node information ({len(sentinels_info)} nodes):")
             for i, sentinel in enumerate(sentinels_info, 1):
@@ -542,470 +1170,482 @@ class RedisSentinelDemo:
     def demo_session_management(self):
         """Session management demo"""
         ColorPrinter.step("Session Management Demo")
-        
-        while True:
-            print("\nSession Management Options:")
-            print("1. Create Session")
-            print("2. View Current Session")
-            print("3. List All Active Sessions")
-            print("4. Delete Session")
-            print("0. Return to Main Menu")
-            
-            choice = input("Please select operation: ").strip()
-            
-            if choice == "1":
-                username = input("Username: ").strip()
-                if username:
-                    user_data = {
-                        "email": input("Email (optional): ").strip(),
-                        "role": input("Role (optional): ").strip() or "user",
-                        "login_ip": "127.0.0.1"
-                    }
-                    session_id = self.session_manager.create_session(username, user_data)
-                    if session_id:
-                        self.current_session_id = session_id
-                        ColorPrinter.info(f"Current session ID: {session_id}")
-            
-            elif choice == "2":
-                if self.current_session_id:
-                    session_data = self.session_manager.get_session(self.current_session_id)
-                    if session_data:
-                        ColorPrinter.success("Current session information:")
-                        print(json.dumps(session_data, indent=2, ensure_ascii=False))
-                    else:
-                        ColorPrinter.warning("Session expired or does not exist")
-                        self.current_session_id = None
-                else:
-                    ColorPrinter.warning("No active session")
-            
-            elif choice == "3":
-                sessions = self.session_manager.list_active_sessions()
-                if sessions:
-                    ColorPrinter.success(f"Active sessions ({len(sessions)} sessions):")
-                    for session_id in sessions:
-                        print(f"  - {session_id}")
-                else:
-                    ColorPrinter.info("No active sessions")
-            
-            elif choice == "4":
-                session_id = input("Session ID to delete (press Enter to delete current session): ").strip()
-                if not session_id and self.current_session_id:
-                    session_id = self.current_session_id
-                
-                if session_id:
-                    if self.session_manager.delete_session(session_id):
-                        if session_id == self.current_session_id:
-                            self.current_session_id = None
-                else:
-                    ColorPrinter.warning("Please provide a valid session ID")
-            
-            elif choice == "0":
-                break
-            
+        self._run_menu(self.SESSION_MENU, self._session_handlers)
+    
+    def _create_session(self):
+        """Create a session and make it current"""
+        username = input("Username: ").strip()
+        if username:
+            user_data = {
+                "email": input("Email (optional): ").strip(),
+                "role": input("Role (optional): ").strip() or "user",
+                "login_ip": "127.0.0.1"
+            }
+            session_id = self.session_manager.create_session(username, user_data)
+            if session_id:
+                self.current_session_id = session_id
+                ColorPrinter.info(f"Current session ID: {session_id}")
+    
+    def _show_current_session(self):
+        """Show the current session"""
+        if self.current_session_id:
+            session_data = self.session_manager.get_session(self.current_session_id)
+            if session_data:
+                ColorPrinter.success("Current session information:")
+                print(json.dumps(session_data, indent=2, ensure_ascii=False))
             else:
-                ColorPrinter.warning("Invalid selection")
+                ColorPrinter.warning("Session expired or does not exist")
+                self.current_session_id = None
+        else:
+            ColorPrinter.warning("No active session")
+    
+    def _list_sessions(self):
+        """List all active sessions"""
+        sessions = self.session_manager.list_active_sessions()
+        if sessions:
+            ColorPrinter.success(f"Active sessions ({len(sessions)} sessions):")
+            session_details = self.session_manager.get_many_sessions(sessions)
+            for session_id in sessions:
+                details = session_details.get(session_id)
+                username = details.get("username", "unknown") if details else "expired"
+                print(f"  - {session_id} ({username})")
+        else:
+            ColorPrinter.info("No active sessions")
+    
+    def _delete_session(self):
+        """Delete a session"""
+        session_id = input("Session ID to delete (press Enter to delete current session): ").strip()
+        if not session_id and self.current_session_id:
+            session_id = self.current_session_id
+        
+        if session_id:
+            if self.session_manager.delete_session(session_id):
+                if session_id == self.current_session_id:
+                    self.current_session_id = None
+        else:
+            ColorPrinter.warning("Please provide a valid session ID")
     
     def demo_crud_operations(self):
         """CRUD Operations Demo"""
         ColorPrinter.step("CRUD Operations Demo")
+        self._run_menu(self.CRUD_MENU, self._crud_handlers)
+    
+    def _set_key(self):
+        """Create or update a key"""
+        key = input("Key name: ").strip()
+        value = input("Value: ").strip()
+        ttl = input("TTL (seconds, optional): ").strip()
         
-        while True:
-            print("\nCRUD Operation Options:")
-            print("1. Create/Update Key-Value")
-            print("2. Read Key-Value")
-            print("3. Delete Key")
-            print("4. Batch Operations")
-            print("5. List All Keys")
-            print("0. Return to Main Menu")
-            
-            choice = input("Please select operation: ").strip()
-            
-            if choice == "1":
-                key = input("Key name: ").strip()
-                value = input("Value: ").strip()
-                ttl = input("TTL (seconds, optional): ").strip()
-                
-                if key and value:
-                    try:
-                        if ttl:
-                            self.sentinel_manager.redis_client.setex(key, int(ttl), value)
-                            ColorPrinter.success(f"Key '{key}' set successfully, TTL: {ttl}s")
-                        else:
-                            self.sentinel_manager.redis_client.set(key, value)
-                            ColorPrinter.success(f"Key '{key}' set successfully")
-                    except Exception as e:
-                        ColorPrinter.error(f"Set failed: {e}")
-            
-            elif choice == "2":
-                key = input("Key name: ").strip()
-                if key:
-                    try:
-                        value = self.sentinel_manager.redis_client.get(key)
-                        if value:
-                            ttl = self.sentinel_manager.redis_client.ttl(key)
-                            ColorPrinter.success(f"Key '{key}' value: {value}")
-                            if ttl > 0:
-                                ColorPrinter.info(f"Remaining TTL: {ttl}s")
-                        else:
-                            ColorPrinter.warning(f"Key '{key}' does not exist")
-                    except Exception as e:
-                        ColorPrinter.error(f"Read failed: {e}")
-            
-            elif choice == "3":
-                key = input("键名: ").strip()
-                if key:
-                    try:
-                        result = self.sentinel_manager.redis_client.delete(key)
-                        if result:
-                            ColorPrinter.success(f"Key '{key}' deleted successfully")
-                        else:
-                            ColorPrinter.warning(f"Key '{key}' does not exist")
-                    except Exception as e:
-                        ColorPrinter.error(f"Delete failed: {e}")
+        if key and value:
+            try:
+                if ttl:
+                    self.sentinel_manager.redis_client.setex(key, int(ttl), value)
+                    ColorPrinter.success(f"Key '{key}' set successfully, TTL: {ttl}s")
+                else:
+                    self.sentinel_manager.redis_client.set(key, value)
+                    ColorPrinter.success(f"Key '{key}' set successfully")
+            except Exception as e:
+                ColorPrinter.error(f"Set failed: {e}")
+    
+    def _read_key(self):
+        """Read a key"""
+        key = input("Key name: ").strip()
+        if key:
+            try:
+                value = self.sentinel_manager.redis_client.get(key)
+                if value:
+                    ttl = self.sentinel_manager.redis_client.ttl(key)
+                    ColorPrinter.success(f"Key '{key}' value: {value}")
+                    if ttl > 0:
+                        ColorPrinter.info(f"Remaining TTL: {ttl}s")
+                else:
+                    ColorPrinter.warning(f"Key '{key}' does not exist")
+            except Exception as e:
+                ColorPrinter.error(f"Read failed: {e}")
+    
+    def _delete_key(self):
+        """Delete a key"""
+        key = input("键名: ").strip()
+        if key:
+            try:
+                result = self.sentinel_manager.redis_client.delete(key)
+                if result:
+                    ColorPrinter.success(f"Key '{key}' deleted successfully")
+                else:
+                    ColorPrinter.warning(f"Key '{key}' does not exist")
+            except Exception as e:
+                ColorPrinter.error(f"Delete failed: {e}")
+    
+    def _batch_operations(self):
+        """Batch set and get keys"""
+        print("Batch Operations Demo:")
+        # Batch set
+        batch_data = {
+            "user:1001": "Alice",
+            "user:1002": "Bob",
+            "user:1003": "Charlie"
+        }
+        
+        try:
+            # Batch set and batch get share a single round trip
+            pipe = self._pipeline()
+            pipe.mset(batch_data)
+            pipe.mget(list(batch_data.keys()))
+            set_ok, values = pipe.execute()
+            if set_ok:
+                ColorPrinter.success(f"Batch set completed: {len(batch_data)} keys")
             
-            elif choice == "4":
-                print("Batch Operations Demo:")
-                # Batch set
-                batch_data = {
-                    "user:1001": "Alice",
-                    "user:1002": "Bob",
-                    "user:1003": "Charlie"
-                }
+            ColorPrinter.success("Batch get results:")
+            for k, v in zip(batch_data.keys(), values):
+                print(f"  {k}: {v}")
                 
-                try:
-                    pipe = self.sentinel_manager.redis_client.pipeline()
-                    for k, v in batch_data.items():
-                        pipe.set(k, v)
-                    results = pipe.execute()
-                    ColorPrinter.success(f"Batch set completed: {len(results)} keys")
-                    
-                    # Batch get
-                    values = self.sentinel_manager.redis_client.mget(list(batch_data.keys()))
-                    ColorPrinter.success("Batch get results:")
-                    for k, v in zip(batch_data.keys(), values):
-                        print(f"  {k}: {v}")
-                        
-                except Exception as e:
-                    ColorPrinter.error(f"Batch operation failed: {e}")
-            
-            elif choice == "5":
-                pattern = input("Key pattern (default *): ").strip() or "*"
-                try:
-                    keys = self.sentinel_manager.redis_client.keys(pattern)
-                    if keys:
-                        ColorPrinter.success(f"Matching keys ({len(keys)} keys):")
-                        for key in sorted(keys):
-                            print(f"  - {key}")
-                    else:
-                        ColorPrinter.info("No matching keys")
-                except Exception as e:
-                    ColorPrinter.error(f"Failed to get key list: {e}")
-            
-            elif choice == "0":
-                break
-            
+        except Exception as e:
+            ColorPrinter.error(f"Batch operation failed: {e}")
+    
+    def _list_keys(self):
+        """List keys matching a pattern"""
+        pattern = input("Key pattern (default *): ").strip() or "*"
+        try:
+            if pattern == "*":
+                key_count = self.sentinel_manager.redis_client.dbsize()
+                if key_count > LARGE_KEYSPACE_THRESHOLD:
+                    ColorPrinter.warning(f"Listing all {key_count} keys, consider a narrower pattern")
+            keys = list(self.sentinel_manager.redis_client.scan_iter(match=pattern, count=500))
+            if keys:
+                ColorPrinter.success(f"Matching keys ({len(keys)} keys):")
+                for key in sorted(keys):
+                    print(f"  - {key}")
             else:
-                ColorPrinter.warning("Invalid selection")
+                ColorPrinter.info("No matching keys")
+        except Exception as e:
+            ColorPrinter.error(f"Failed to get key list: {e}")
     
     def demo_cache_operations(self):
         """Cache operations demo"""
         ColorPrinter.step("Cache Operations Demo")
+        self._run_menu(self.CACHE_MENU, self._cache_handlers)
+    
+    def _set_cache(self):
+        """Set a cache entry"""
+        key = input("Cache key: ").strip()
+        value = input("Cache value: ").strip()
+        ttl = input(f"TTL (seconds, default {self.cache_manager.ttl_for(key)}): ").strip()
         
-        while True:
-            print("\nCache Operation Options:")
-            print("1. Set Cache")
-            print("2. Get Cache")
-            print("3. Delete Cache")
-            print("4. Simulate Database Query Cache")
-            print("0. Return to Main Menu")
+        if key and value:
+            ttl = int(ttl) if ttl else None
+            self.cache_manager.set_cache(key, value, ttl)
+    
+    def _get_cache(self):
+        """Get a cache entry"""
+        key = input("Cache key: ").strip()
+        if key:
+            value = self.cache_manager.get_cache(key)
+            if value:
+                print(f"Cache value: {value}")
+    
+    def _get_many_caches(self):
+        """Get several cache entries in one round trip"""
+        keys = input("Cache keys (space separated): ").split()
+        if keys:
+            values = self.cache_manager.get_many(keys)
+            for key, value in values.items():
+                print(f"  {key}: {value if value is not None else '(miss)'}")
+    
+    def _delete_cache(self):
+        """Delete a cache entry"""
+        key = input("Cache key: ").strip()
+        if key:
+            self.cache_manager.delete_cache(key)
+    
+    def _query_user_with_cache(self):
+        """Simulate a database query backed by the cache"""
+        # Simulate database query cache scenario
+        user_id = input("User ID: ").strip()
+        if user_id:
+            cache_key = f"user:{user_id}"
             
-            choice = input("Please select operation: ").strip()
+            # Try to get from cache first
+            cached_data = self.cache_manager.get_cache(cache_key)
             
-            if choice == "1":
-                key = input("Cache key: ").strip()
-                value = input("Cache value: ").strip()
-                ttl = input("TTL (seconds, default 300): ").strip()
+            if cached_data:
+                ColorPrinter.success("Retrieved user info from cache")
+                print(f"User info: {cached_data}")
+            else:
+                # Simulate database query
+                ColorPrinter.info(
+                    f"Cache miss, simulating database query "
+                    f"({self.simulate_latency:g}s latency, set with --simulate-latency)..."
+                )
+                if self.simulate_latency:
+                    time.sleep(self.simulate_latency)  # Simulate query delay
                 
-                if key and value:
-                    ttl = int(ttl) if ttl else 300
-                    self.cache_manager.set_cache(key, value, ttl)
-            
-            elif choice == "2":
-                key = input("Cache key: ").strip()
-                if key:
-                    value = self.cache_manager.get_cache(key)
-                    if value:
-                        print(f"Cache value: {value}")
-            
-            elif choice == "3":
-                key = input("Cache key: ").strip()
-                if key:
-                    self.cache_manager.delete_cache(key)
-            
-            elif choice == "4":
-                # Simulate database query cache scenario
-                user_id = input("User ID: ").strip()
-                if user_id:
-                    cache_key = f"user_profile_{user_id}"
-                    
-                    # Try to get from cache first
+                # Simulate query result
+                user_data = {
+                    "id": user_id,
+                    "name": f"User_{user_id}",
+                    "email": f"user{user_id}@example.com",
+                    "created_at": datetime.now().isoformat()
+                }
+                
+                # Store in cache, serialized once to compact bytes that go to Redis as-is
+                payload = orjson.dumps(user_data)
+                stored = self.cache_manager.set_cache(cache_key, payload, nx=True)
+                if stored is False:
+                    # Another client filled the cache first, its value wins
                     cached_data = self.cache_manager.get_cache(cache_key)
-                    
                     if cached_data:
-                        ColorPrinter.success("Retrieved user info from cache")
                         print(f"User info: {cached_data}")
-                    else:
-                        # Simulate database query
-                        ColorPrinter.info("Cache miss, simulating database query...")
-                        time.sleep(1)  # Simulate query delay
-                        
-                        # Simulate query result
-                        user_data = {
-                            "id": user_id,
-                            "name": f"User_{user_id}",
-                            "email": f"user{user_id}@example.com",
-                            "created_at": datetime.now().isoformat()
-                        }
-                        
-                        # Store in cache
-                        self.cache_manager.set_cache(cache_key, json.dumps(user_data), 600)
-                        ColorPrinter.success("Query result cached")
-                        print(f"User info: {json.dumps(user_data, indent=2, ensure_ascii=False)}")
-            
-            elif choice == "0":
-                break
-            
-            else:
-                ColorPrinter.warning("Invalid selection")
+                        return
+                elif stored:
+                    ColorPrinter.success("Query result cached")
+                if self.verbose:
+                    print(f"User info: {orjson.dumps(user_data, option=orjson.OPT_INDENT_2).decode()}")
+                else:
+                    print(f"User info: {payload.decode()}")
     
     def demo_counter_operations(self):
         """Counter operations demo"""
         ColorPrinter.step("Counter Operations Demo")
+        self._run_menu(self.COUNTER_MENU, self._counter_handlers)
+    
+    def _increment_counter(self):
+        """Increment a counter"""
+        key = input("Counter name: ").strip()
+        amount = input("Increment amount (default 1): ").strip()
         
-        while True:
-            print("\nCounter Operation Options:")
-            print("1. Increment Counter")
-            print("2. Decrement Counter")
-            print("3. Get Counter Value")
-            print("4. Reset Counter")
-            print("5. Simulate Website Visit Statistics")
-            print("0. Return to Main Menu")
+        if key:
+            amount = int(amount) if amount else 1
+            self.counter_manager.increment(key, amount)
+    
+    def _decrement_counter(self):
+        """Decrement a counter"""
+        key = input("Counter name: ").strip()
+        amount = input("Decrement amount (default 1): ").strip()
+        
+        if key:
+            amount = int(amount) if amount else 1
+            self.counter_manager.decrement(key, amount)
+    
+    def _get_counter(self):
+        """Get a counter value"""
+        key = input("Counter name: ").strip()
+        if key:
+            self.counter_manager.get_count(key)
+    
+    def _reset_counter(self):
+        """Reset a counter"""
+        key = input("Counter name: ").strip()
+        if key:
+            self.counter_manager.reset_counter(key)
+    
+    def _simulate_page_visits(self):
+        """Simulate website visit statistics"""
+        # Simulate website visit statistics
+        ColorPrinter.info("Simulating website visit statistics...")
+        
+        pages = ["home", "about", "products", "contact"]
+        
+        try:
+            # Tally visits locally, then apply them and read every page back in one script call
+            visits = Counter(random.choices(pages, k=10))
+            counts = self.counter_manager.increment_many(
+                {f"page_views_{page}": visits[page] for page in pages}
+            )
+            if not counts:
+                return
+            ColorPrinter.success("Visit statistics completed, viewing results:")
+            for page in pages:
+                print(f"  {page} page views: {counts[f'page_views_{page}']}")
+        except Exception as e:
+            ColorPrinter.error(f"Visit statistics failed: {e}")
+    
+    def demo_high_availability(self):
+        """High availability demo"""
+        ColorPrinter.step("High Availability Test")
+        self._run_menu(self.HA_MENU, self._ha_handlers)
+    
+    def _test_connection(self):
+        """Test Redis and Sentinel connectivity"""
+        if not self._breaker_allows_call():
+            ColorPrinter.warning("Circuit open, skipping connection test while the cluster recovers")
+            return
+        
+        try:
+            # 测试Redis连接: PING and INFO replication share one round trip
+            pipe = self._pipeline()
+            pipe.ping()
+            pipe.info("replication")
+            result, replication = pipe.execute()
+            if result:
+                ColorPrinter.success(
+                    f"Redis connection normal (role: {replication.get('role', 'unknown')}, "
+                    f"connected slaves: {replication.get('connected_slaves', 'unknown')})"
+                )
             
-            choice = input("Please select operation: ").strip()
+            # Test Sentinel connection
+            masters = self.sentinel_manager.sentinel.sentinel_masters()
+            masters_count = self._count_masters(masters)
+            # 只要调用成功即认为连通，数量未知时以unknown展示
+            masters_count_str = "unknown" if masters_count is None else str(masters_count)
+            ColorPrinter.success(f"Sentinel connection normal, monitoring {masters_count_str} master nodes")
             
-            if choice == "1":
-                key = input("Counter name: ").strip()
-                amount = input("Increment amount (default 1): ").strip()
-                
-                if key:
-                    amount = int(amount) if amount else 1
-                    self.counter_manager.increment(key, amount)
+            # Show current master node from data already at hand instead of another query
+            master_name = self.sentinel_manager.config.master_name
+            if isinstance(masters, dict) and master_name in masters:
+                master_addr = (masters[master_name].get('ip'), masters[master_name].get('port'))
+            else:
+                master_addr = self.sentinel_manager.redis_client.connection_pool.master_address
+            if master_addr:
+                ColorPrinter.info(f"Current master node: {master_addr[0]}:{master_addr[1]}")
             
-            elif choice == "2":
-                key = input("Counter name: ").strip()
-                amount = input("Decrement amount (default 1): ").strip()
+            self._breaker_record(True)
                 
-                if key:
-                    amount = int(amount) if amount else 1
-                    self.counter_manager.decrement(key, amount)
+        except Exception as e:
+            ColorPrinter.error(f"Connection test failed: {e}")
+            self._breaker_record(False)
             
-            elif choice == "3":
-                key = input("Counter name: ").strip()
-                if key:
-                    self.counter_manager.get_count(key)
+            # SentinelConnectionPool already asks Sentinel for the current master whenever a
+            # connection is re-established, so a full rebuild is only worth its discovery and
+            # PING timeouts once the breaker has opened and probing pauses anyway
+            if self._breaker["state"] == "OPEN":
+                self._reconnect()
+    
+    def _test_failover(self):
+        """Trigger a failover and reconnect"""
+        ColorPrinter.warning("Failover test will cause brief service interruption")
+        confirm = input("Confirm failover test execution? (y/N): ").strip().lower()
+        
+        if confirm == 'y':
+            success = self.sentinel_manager.test_failover()
+            if success:
+                ColorPrinter.success("Failover test completed")
+                # Reconnect to ensure using new master node
+                if self._reconnect():
+                    ColorPrinter.success("Reconnected to new master node")
+            else:
+                ColorPrinter.error("Failover test failed")
+        else:
+            ColorPrinter.info("Failover test cancelled")
+    
+    def _test_consistency(self):
+        """Write a key and read it back"""
+        ColorPrinter.info("Executing read-write consistency test...")
+        
+        test_key = f"consistency_test_{int(time.time())}"
+        test_value = f"test_value_{uuid.uuid4().hex[:8]}"
+        
+        try:
+            # Write data
+            self.sentinel_manager.redis_client.set(test_key, test_value)
+            ColorPrinter.success(f"Written test data: {test_key} = {test_value}")
             
-            elif choice == "4":
-                key = input("Counter name: ").strip()
-                if key:
-                    self.counter_manager.reset_counter(key)
+            # Read immediately
+            read_value = self.sentinel_manager.redis_client.get(test_key)
             
-            elif choice == "5":
-                # Simulate website visit statistics
-                ColorPrinter.info("Simulating website visit statistics...")
-                
-                pages = ["home", "about", "products", "contact"]
-                
-                for _ in range(10):
-                    page = pages[int(time.time() * 1000) % len(pages)]
-                    self.counter_manager.increment(f"page_views_{page}")
-                    time.sleep(0.1)
-                
-                ColorPrinter.success("Visit statistics completed, viewing results:")
-                for page in pages:
-                    count = self.counter_manager.get_count(f"page_views_{page}")
-                    print(f"  {page} page views: {count}")
+            if read_value == test_value:
+                ColorPrinter.success("Read-write consistency test passed")
+            else:
+                ColorPrinter.error(f"Read-write consistency test failed: expected {test_value}, actual {read_value}")
             
-            elif choice == "0":
-                break
+            # Clean up test data
+            self.sentinel_manager.redis_client.delete(test_key)
             
-            else:
-                ColorPrinter.warning("Invalid selection")
+        except Exception as e:
+            ColorPrinter.error(f"Read-write consistency test failed: {e}")
     
-    def demo_high_availability(self):
-        """High availability demo"""
-        ColorPrinter.step("High Availability Test")
+    def _run_stress_test(self):
+        """Run the pipelined write stress test"""
+        ColorPrinter.info("Executing performance stress test...")
         
-        while True:
-            print("\nHigh Availability Test Options:")
-            print("1. Connection Status Test")
-            print("2. Failover Test")
-            print("3. Read-Write Consistency Test")
-            print("4. Performance Stress Test")
-            print("0. Return to Main Menu")
-            
-            choice = input("Please select operation: ").strip()
-            
-            if choice == "1":
-                try:
-                    # 测试Redis连接
-                    result = self.sentinel_manager.redis_client.ping()
-                    if result:
-                        ColorPrinter.success("Redis connection normal")
-                    
-                    # Test Sentinel connection
-                    masters = self.sentinel_manager.sentinel.sentinel_masters()
-                    # 兼容不同返回类型，避免因bool类型导致len()报错
-                    masters_count_str = "unknown"
-                    if isinstance(masters, dict):
-                        masters_count_str = str(len(masters))
-                    elif isinstance(masters, list):
-                        masters_count_str = str(len(masters))
-                    elif isinstance(masters, bool):
-                        # 某些环境会返回bool，无法统计数量，尝试探测master地址以验证连通性
-                        try:
-                            addr = self.sentinel_manager.sentinel.discover_master(self.sentinel_manager.config.master_name)
-                            if addr and isinstance(addr, (list, tuple)):
-                                masters_count_str = "1"
-                        except Exception:
-                            masters_count_str = "unknown"
-                    # 只要调用成功即认为连通，数量未知时以unknown展示
-                    ColorPrinter.success(f"Sentinel connection normal, monitoring {masters_count_str} master nodes")
-                    
-                    # Show current master node
-                    master_info = self.sentinel_manager.get_master_info()
-                    if master_info:
-                        ColorPrinter.info(f"Current master node: {master_info.get('ip')}:{master_info.get('port')}")
-                        
-                except Exception as e:
-                    ColorPrinter.error(f"Connection test failed: {e}")
+        operations = int(input("Number of test operations (default 1000): ") or "1000")
+        
+        start_time = time.time()
+        success_count = 0
+        error_count = 0
+        
+        try:
+            # One pipeline is reused for every batch
+            pipe = self._pipeline()
+            # Draw all random value suffixes at once instead of one uuid4() per operation
+            rand_pool = os.urandom(operations * 4)
+            # Keys are remembered as they are written so cleanup does not format them again
+            test_keys = [None] * operations
             
-            elif choice == "2":
-                ColorPrinter.warning("Failover test will cause brief service interruption")
-                confirm = input("Confirm failover test execution? (y/N): ").strip().lower()
+            for i in range(operations):
+                key = f"perf_test_{i}"
+                test_keys[i] = key
+                value = f"value_{i}_{rand_pool[i * 4:(i + 1) * 4].hex()}"
+                pipe.set(key, value)
                 
-                if confirm == 'y':
-                    success = self.sentinel_manager.test_failover()
-                    if success:
-                        ColorPrinter.success("Failover test completed")
-                        # Reconnect to ensure using new master node
-                        try:
-                            self.sentinel_manager._connect()
-                            ColorPrinter.success("Reconnected to new master node")
-                        except Exception as e:
-                            ColorPrinter.error(f"Reconnection failed: {e}")
-                    else:
-                        ColorPrinter.error("Failover test failed")
-                else:
-                    ColorPrinter.info("Failover test cancelled")
+                if (i + 1) % PERF_TEST_BATCH_SIZE == 0:
+                    try:
+                        pipe.execute()
+                        success_count += PERF_TEST_BATCH_SIZE
+                    except Exception as e:
+                        error_count += PERF_TEST_BATCH_SIZE
+                        ColorPrinter.error(f"Batch execution failed: {e}")
+                    finally:
+                        pipe.reset()
             
-            elif choice == "3":
-                ColorPrinter.info("Executing read-write consistency test...")
-                
-                test_key = f"consistency_test_{int(time.time())}"
-                test_value = f"test_value_{uuid.uuid4().hex[:8]}"
-                
+            # Execute remaining operations
+            remaining = operations % PERF_TEST_BATCH_SIZE
+            if remaining:
                 try:
-                    # Write data
-                    self.sentinel_manager.redis_client.set(test_key, test_value)
-                    ColorPrinter.success(f"Written test data: {test_key} = {test_value}")
-                    
-                    # Read immediately
-                    read_value = self.sentinel_manager.redis_client.get(test_key)
-                    
-                    if read_value == test_value:
-                        ColorPrinter.success("Read-write consistency test passed")
-                    else:
-                        ColorPrinter.error(f"Read-write consistency test failed: expected {test_value}, actual {read_value}")
-                    
-                    # Clean up test data
-                    self.sentinel_manager.redis_client.delete(test_key)
-                    
+                    pipe.execute()
+                    success_count += remaining
                 except Exception as e:
-                    ColorPrinter.error(f"Read-write consistency test failed: {e}")
+                    error_count += remaining
+                    ColorPrinter.error(f"Final batch execution failed: {e}")
+                finally:
+                    pipe.reset()
             
-            elif choice == "4":
-                ColorPrinter.info("Executing performance stress test...")
-                
-                operations = int(input("Number of test operations (default 1000): ") or "1000")
-                
-                start_time = time.time()
-                success_count = 0
-                error_count = 0
-                
-                try:
-                    pipe = self.sentinel_manager.redis_client.pipeline()
-                    
-                    for i in range(operations):
-                        key = f"perf_test_{i}"
-                        value = f"value_{i}_{uuid.uuid4().hex[:8]}"
-                        pipe.set(key, value)
-                        
-                        if (i + 1) % 100 == 0:
-                            try:
-                                pipe.execute()
-                                success_count += 100
-                                pipe = self.sentinel_manager.redis_client.pipeline()
-                            except Exception as e:
-                                error_count += 100
-                                ColorPrinter.error(f"Batch execution failed: {e}")
-                                pipe = self.sentinel_manager.redis_client.pipeline()
-                    
-                    # Execute remaining operations
-                    if operations % 100 != 0:
-                        try:
-                            pipe.execute()
-                            success_count += operations % 100
-                        except Exception as e:
-                            error_count += operations % 100
-                            ColorPrinter.error(f"Final batch execution failed: {e}")
-                    
-                    end_time = time.time()
-                    duration = end_time - start_time
-                    
-                    ColorPrinter.success(f"Performance test completed:")
-                    print(f"  Total operations: {operations}")
-                    print(f"  Successful operations: {success_count}")
-                    print(f"  Failed operations: {error_count}")
-                    print(f"  Total time: {duration:.2f}s")
-                    print(f"  Average QPS: {operations/duration:.2f}")
-                    
-                    # Clean up test data
-                    ColorPrinter.info("Cleaning up test data...")
-                    test_keys = [f"perf_test_{i}" for i in range(operations)]
-                    deleted = self.sentinel_manager.redis_client.delete(*test_keys)
-                    ColorPrinter.success(f"Cleanup completed, deleted {deleted} keys")
-                    
-                except Exception as e:
-                    ColorPrinter.error(f"Performance test failed: {e}")
+            end_time = time.time()
+            duration = end_time - start_time
             
-            elif choice == "0":
-                break
+            ColorPrinter.success(f"Performance test completed:")
+            print(f"  Total operations: {operations}")
+            print(f"  Successful operations: {success_count}")
+            print(f"  Failed operations: {error_count}")
+            print(f"  Total time: {duration:.2f}s")
+            print(f"  Average QPS: {operations/duration:.2f}")
             
-            else:
-                ColorPrinter.warning("Invalid selection")
+            # Clean up test data
+            ColorPrinter.info("Cleaning up test data...")
+            # UNLINK frees memory in the background, chunked to keep each command short
+            pipe = self._pipeline()
+            for j in range(0, operations, CLEANUP_CHUNK_SIZE):
+                pipe.unlink(*test_keys[j:j + CLEANUP_CHUNK_SIZE])
+            deleted = sum(pipe.execute())
+            ColorPrinter.success(f"Cleanup completed, deleted {deleted} keys")
+            
+        except Exception as e:
+            ColorPrinter.error(f"Performance test failed: {e}")
+    
+    def _load_history(self):
+        """Load menu input history so earlier entries can be recalled with the arrow keys"""
+        if readline is None:
+            return
+        readline.set_history_length(HISTORY_LENGTH)
+        # Drop the connection setup answers so only menu input is ever saved
+        readline.clear_history()
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:
+            pass
+    
+    def _save_history(self):
+        """Save menu input history for the next run"""
+        if readline is None:
+            return
+        try:
+            readline.write_history_file(HISTORY_FILE)
+        except OSError as e:
+            logger.debug(f"Could not save input history: {e}")
     
     def show_main_menu(self):
         """Show main menu"""
-        ColorPrinter.header("\nRedis Sentinel Demo Program")
-        ColorPrinter.header("=" * 50)
-        print("1. Show Cluster Information")
-        print("2. Session Management Demo")
-        print("3. CRUD Operations Demo")
-        print("4. Cache Operations Demo")
-        print("5. Counter Operations Demo")
-        print("6. High Availability Test")
-        print("0. Exit Program")
-        print("=" * 50)
+        sys.stdout.write(self.MAIN_MENU)
+        sys.stdout.flush()
     
     def run(self):
         """Run demo program"""
@@ -1020,43 +1660,48 @@ class RedisSentinelDemo:
         # Show cluster information
         self.show_cluster_info()
         
+        self._load_history()
+        
         # Main loop
         while True:
             try:
                 self.show_main_menu()
-                choice = input("Please select operation: ").strip()
+                choice = input(self.PROMPT).strip()
                 
-                if choice == "1":
-                    self.show_cluster_info()
-                elif choice == "2":
-                    self.demo_session_management()
-                elif choice == "3":
-                    self.demo_crud_operations()
-                elif choice == "4":
-                    self.demo_cache_operations()
-                elif choice == "5":
-                    self.demo_counter_operations()
-                elif choice == "6":
-                    self.demo_high_availability()
-                elif choice == "0":
+                if choice == "0":
                     ColorPrinter.success("Thank you for using Redis Sentinel Demo Program!")
                     break
+                
+                handler = self._main_handlers.get(choice)
+                if handler:
+                    handler()
                 else:
                     ColorPrinter.warning("Invalid selection, please try again")
                     
             except KeyboardInterrupt:
                 ColorPrinter.warning("\nProgram interrupted by user")
                 break
+            except EOFError:
+                # End of piped input (scripted runs) ends the program like choice "0"
+                ColorPrinter.success("Thank you for using Redis Sentinel Demo Program!")
+                break
             except Exception as e:
                 ColorPrinter.error(f"Program error: {e}")
                 logger.exception("Program exception")
+        
+        self._save_history()
 
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(description="Redis Sentinel Cluster Demo Program")
-    parser.add_argument("--config", help="Configuration file path")
+    parser.add_argument("--config", help="JSON configuration file path (skips connection prompts)")
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], 
                        default="INFO", help="Log level")
+    parser.add_argument("--client-cache-size", type=int, default=0,
+                       help="Enable RESP3 client-side caching with this many entries (Redis 6+)")
+    parser.add_argument("--verbose", action="store_true", help="Pretty-print cached query results")
+    parser.add_argument("--simulate-latency", type=float, default=0.0,
+                       help="Seconds of fake database latency on a cache miss (default 0, no delay)")
     
     args = parser.parse_args()
     
@@ -1064,7 +1709,12 @@ def main():
     logging.getLogger().setLevel(getattr(logging, args.log_level))
     
     try:
-        demo = RedisSentinelDemo()
+        demo = RedisSentinelDemo(
+            config_path=args.config,
+            client_cache_size=args.client_cache_size,
+            verbose=args.verbose,
+            simulate_latency=args.simulate_latency
+        )
         demo.run()
     except Exception as e:
         ColorPrinter.error(f"Program startup failed: {e}")